@@ -0,0 +1,47 @@
+# gnews.py
+"""
+GNews helpers shared by news_bot.py (Tk UI) and news_digest.py (headless daemon).
+Kept free of UI imports so the daemon runs on servers without Tk.
+"""
+
+import os
+import threading
+import time
+
+import requests
+
+COUNTRIES = {
+    "United States": "us",
+    "India": "in",
+    "United Kingdom": "gb",
+    "Canada": "ca",
+    "Australia": "au",
+    "Pakistan": "pk",
+    "Germany": "de"
+}
+CATEGORIES = ["world", "nation", "business", "technology", "entertainment", "sports", "science", "health"]
+
+GNEWS_MIN_INTERVAL = 1.0  # GNews allows at most 1 request/second
+
+_gnews_lock = threading.Lock()
+_gnews_last_request = 0.0
+
+def wait_for_gnews_slot():
+    """Block until GNEWS_MIN_INTERVAL has passed since the previous GNews request."""
+    global _gnews_last_request
+    with _gnews_lock:
+        delay = _gnews_last_request + GNEWS_MIN_INTERVAL - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        _gnews_last_request = time.monotonic()
+
+def fetch_articles(country, category, max_articles=5):
+    """Return the raw GNews article dicts (title, url, description, ...) for one feed.
+
+    Reads GNEWS_API_KEY at call time, so callers load their .env first.
+    """
+    url = f"https://gnews.io/api/v4/top-headlines?country={country}&topic={category}&token={os.getenv('GNEWS_API_KEY')}"
+    wait_for_gnews_slot()  # Every caller in the process shares one rate limit
+    response = requests.get(url, timeout=10)
+    response.raise_for_status()
+    return response.json().get("articles", [])[:max_articles]
@@ -1,13 +1,19 @@
 import os
+import sys
 import google.generativeai as genai
 from dotenv import load_dotenv
 
+from model_catalog import load_catalog
+
 load_dotenv()  # Loads your .env file
 
 genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
 
+# Models come from model_catalog's on-disk cache (up to a day old);
+# pass --refresh to list them live again.
+refresh = "--refresh" in sys.argv
 print("🔍 Fetching available Gemini models...\n")
 
-for model in genai.list_models():
-    print(f"🧩 Model name: {model.name}")
-    print(f"   Supported generation methods: {model.supported_generation_methods}\n")
+for model in load_catalog(refresh=refresh)["models"]:
+    print(f"🧩 Model name: {model['name']}")
+    print(f"   Supported generation methods: {model.get('supported_generation_methods', [])}\n")
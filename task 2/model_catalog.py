@@ -0,0 +1,255 @@
+# model_catalog.py
+"""
+Gemini Model Catalog & Router
+- Caches genai.list_models() on disk with a TTL instead of listing live every run
+- Probes models for latency/throughput (the generate function is injectable,
+  so probes and routing can be exercised offline)
+- Routes each request to a model by input size, latency target and availability,
+  falling back to the next candidate when a model is missing or overloaded
+
+The calling script is expected to run genai.configure(...) first.
+
+Usage:
+    python model_catalog.py            # show cached catalog
+    python model_catalog.py --refresh  # re-list models now
+    python model_catalog.py --probe    # measure latency of every model
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+
+import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+
+# ==============================
+# Settings
+# ==============================
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".model_catalog.json")
+CATALOG_TTL_SECONDS = 24 * 60 * 60
+UNAVAILABLE_COOLDOWN_SECONDS = 10 * 60
+CHARS_PER_TOKEN = 4  # Rough estimate, good enough for routing
+PROBE_PROMPT = "Reply with one short sentence describing the weather on a sunny day."
+
+# Preference order when several models fit; the first one is the default.
+PREFERRED_MODELS = [
+    "models/gemini-2.5-flash",
+    "models/gemini-2.5-pro",
+    "models/gemini-1.5-flash",
+]
+
+# Errors that mean "try another model", not "the request itself is bad".
+FALLBACK_ERRORS = (
+    google_exceptions.NotFound,
+    google_exceptions.PermissionDenied,
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+)
+
+# ==============================
+# Catalog (disk cache)
+# ==============================
+def list_live_models(list_models=None):
+    """Return every listed model as a plain dict (routing filters to generateContent)."""
+    list_models = list_models or genai.list_models
+    models = []
+    for m in list_models():
+        models.append({
+            "name": m.name,
+            "supported_generation_methods": list(m.supported_generation_methods),
+            "input_token_limit": getattr(m, "input_token_limit", None),
+            "output_token_limit": getattr(m, "output_token_limit", None),
+        })
+    return models
+
+def save_catalog(catalog, path=CATALOG_PATH):
+    """Write to a temp file and swap it in, so readers never see a half-written catalog."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(catalog, f, indent=2)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+def load_catalog(path=CATALOG_PATH, ttl=CATALOG_TTL_SECONDS, list_models=None, refresh=False, now=time.time):
+    """Return the cached catalog, re-listing models when it is missing or older than `ttl`.
+
+    If listing fails, a stale cache is still returned; with no cache at all the
+    catalog is empty and the router falls back to PREFERRED_MODELS.
+    """
+    cached = None
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            cached = None
+
+    if cached and not refresh and now() - cached.get("fetched_at", 0) <= ttl:
+        return cached
+
+    try:
+        models = list_live_models(list_models)
+    except Exception as e:
+        print(f"⚠️ Could not list models ({e}), using cached catalog")
+        return cached or {"fetched_at": 0, "models": [], "probes": {}}
+
+    catalog = {
+        "fetched_at": now(),
+        "models": models,
+        "probes": (cached or {}).get("probes", {}),
+    }
+    save_catalog(catalog, path)
+    return catalog
+
+# ==============================
+# Probing
+# ==============================
+def default_generate(model_name, prompt):
+    return genai.GenerativeModel(model_name).generate_content(prompt).text
+
+def probe_model(model_name, generate=None, prompt=PROBE_PROMPT, clock=time.perf_counter):
+    """Time one small request and estimate output throughput in tokens/second."""
+    generate = generate or default_generate
+    start = clock()
+    try:
+        text = generate(model_name, prompt)
+    except Exception as e:
+        return {"ok": False, "error": str(e), "probed_at": time.time()}
+    latency = max(clock() - start, 1e-6)
+    tokens = max(len(text) // CHARS_PER_TOKEN, 1)
+    return {
+        "ok": True,
+        "latency_s": round(latency, 3),
+        "tokens_per_s": round(tokens / latency, 1),
+        "probed_at": time.time(),
+    }
+
+def supports_generate_content(model):
+    return "generateContent" in model.get("supported_generation_methods", [])
+
+def probe_catalog(catalog, generate=None, path=CATALOG_PATH, clock=time.perf_counter):
+    """Probe every generateContent model in the catalog and persist the results."""
+    for model in filter(supports_generate_content, catalog["models"]):
+        catalog["probes"][model["name"]] = probe_model(model["name"], generate, clock=clock)
+    if path:
+        save_catalog(catalog, path)
+    return catalog
+
+# ==============================
+# Routing
+# ==============================
+class ModelRouter:
+    """Picks a model per request and falls back when one is unavailable."""
+
+    def __init__(self, catalog, preferred=None, now=time.time):
+        self.catalog = catalog
+        self.preferred = preferred or PREFERRED_MODELS
+        self.now = now
+        self._unavailable = {}  # model name -> time it may be retried
+
+    def mark_unavailable(self, model_name, cooldown=UNAVAILABLE_COOLDOWN_SECONDS):
+        self._unavailable[model_name] = self.now() + cooldown
+
+    def is_available(self, model_name):
+        retry_at = self._unavailable.get(model_name)
+        return retry_at is None or self.now() >= retry_at
+
+    def candidates(self, input_chars=0, latency_target=None):
+        """Return model names to try, best first.
+
+        Only `self.preferred` (text models) are considered, so a fallback never
+        lands on TTS, image or preview models that happen to support
+        generateContent. Models that are cooling down, unknown to the catalog,
+        or too small for the input are dropped. Among the rest, models whose
+        probed latency meets `latency_target` come first, then the preference
+        order, then latency.
+        """
+        known = {m["name"]: m for m in self.catalog.get("models", []) if supports_generate_content(m)}
+        probes = self.catalog.get("probes", {})
+        input_tokens = input_chars // CHARS_PER_TOKEN
+
+        names = [n for n in self.preferred if not known or n in known]
+
+        def fits(name):
+            limit = known.get(name, {}).get("input_token_limit")
+            return limit is None or input_tokens <= limit
+
+        def rank(name):
+            probe = probes.get(name, {})
+            latency = probe.get("latency_s") if probe.get("ok") else None
+            misses_target = latency_target is not None and (latency is None or latency > latency_target)
+            return (misses_target, self.preferred.index(name), latency if latency is not None else float("inf"))
+
+        return sorted((n for n in names if self.is_available(n) and fits(n)), key=rank)
+
+    def generate(self, prompt, latency_target=None, generate=None):
+        """Run `prompt` on the best model, falling back on availability errors.
+
+        Returns (model_name, text).
+        """
+        generate = generate or default_generate
+        last_error = None
+        for name in self.candidates(len(prompt), latency_target):
+            try:
+                return name, generate(name, prompt)
+            except FALLBACK_ERRORS as e:
+                print(f"⚠️ {name} unavailable ({e}), trying next model")
+                self.mark_unavailable(name)
+                last_error = e
+        raise RuntimeError(f"No Gemini model available for this request: {last_error}")
+
+_default_router = None
+_default_router_lock = threading.Lock()
+_next_catalog_check = 0.0
+
+def get_router():
+    """Shared router backed by the on-disk catalog.
+
+    The catalog is reloaded once it is older than CATALOG_TTL_SECONDS, so
+    long-running processes (news_digest.py) pick up model changes. If the
+    reload can't list models, it is retried after UNAVAILABLE_COOLDOWN_SECONDS.
+    """
+    global _default_router, _next_catalog_check
+    with _default_router_lock:
+        now = time.time()
+        if _default_router is None:
+            _default_router = ModelRouter(load_catalog())
+            _next_catalog_check = now + UNAVAILABLE_COOLDOWN_SECONDS
+        elif now - _default_router.catalog.get("fetched_at", 0) > CATALOG_TTL_SECONDS and now >= _next_catalog_check:
+            _default_router.catalog = load_catalog()
+            _next_catalog_check = now + UNAVAILABLE_COOLDOWN_SECONDS
+    return _default_router
+
+# ==============================
+# CLI
+# ==============================
+def main():
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Cached Gemini model catalog")
+    parser.add_argument("--refresh", action="store_true", help="Re-list models even if the cache is fresh")
+    parser.add_argument("--probe", action="store_true", help="Measure latency/throughput of every model")
+    args = parser.parse_args()
+
+    load_dotenv()
+    genai.configure(api_key=os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY"))
+
+    catalog = load_catalog(refresh=args.refresh)
+    if args.probe:
+        catalog = probe_catalog(catalog)
+
+    print("\n✅ Available models for your API key:\n")
+    for model in filter(supports_generate_content, catalog["models"]):
+        probe = catalog["probes"].get(model["name"], {})
+        stats = f"  {probe['latency_s']}s, {probe['tokens_per_s']} tok/s" if probe.get("ok") else ""
+        print(f" - {model['name']} (input limit: {model['input_token_limit']}){stats}")
+
+if __name__ == "__main__":
+    main()
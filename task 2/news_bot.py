@@ -1,199 +1,354 @@
 import os
-import requests
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import google.generativeai as genai
 from dotenv import load_dotenv
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 
+from gnews import COUNTRIES, CATEGORIES, fetch_articles
+from model_catalog import get_router
+
 # Load environment variables
 load_dotenv()
-GNEWS_API_KEY = os.getenv("GNEWS_API_KEY")
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 
 # Configure Gemini
 genai.configure(api_key=GOOGLE_API_KEY)
 
-# Data for UI
-COUNTRIES = {
-    "United States": "us",
-    "India": "in",
-    "United Kingdom": "gb",
-    "Canada": "ca",
-    "Australia": "au",
-    "Pakistan": "pk",
-    "Germany": "de"
-}
-CATEGORIES = ["world", "nation", "business", "technology", "entertainment", "sports", "science", "health"]
-
-# ---------------- Fetch News Function (Unchanged) ----------------
-def fetch_news(country, category):
-    url = f"https://gnews.io/api/v4/top-headlines?country={country}&topic={category}&token={GNEWS_API_KEY}"
-    response = requests.get(url)
-    if response.status_code == 200:
-        articles = response.json().get("articles", [])
-        return [article["title"] for article in articles[:5]] if articles else ["No news found."]
+# Background work settings
+CACHE_TTL_SECONDS = 10 * 60  # How long a fetched feed stays fresh
+MAX_WORKERS = 3              # Parallel fetch/summarize jobs (keeps API usage polite)
+POLL_INTERVAL_MS = 100       # How often the UI checks for finished jobs
+SUMMARY_LATENCY_TARGET = 5.0 # Seconds; the router prefers models probed under this
+
+NO_NEWS = "No news found."
+
+# ---------------- Summarize with Gemini ----------------
+# Per-feed delta state: key -> {"seen": headlines behind the summary, "summary": last summary}
+feed_state = {}
+feed_state_lock = threading.Lock()
+
+def summarize_with_gemini(news_list, feed_key=None):
+    """Summarize headlines, only sending new ones to the model when `feed_key` has history.
+
+    Without a `feed_key` the full list is summarized every time (original behaviour).
+    """
+    with feed_state_lock:
+        state = feed_state.get(feed_key) if feed_key is not None else None
+        previous = dict(state) if state else None
+
+    new_headlines = [h for h in news_list if not previous or h not in previous["seen"]]
+    dropped_headlines = previous["seen"] - set(news_list) if previous else set()
+    if previous and not new_headlines and not dropped_headlines:
+        return previous["summary"]  # Nothing changed since last time
+
+    if previous:
+        prompt = (
+            "Here is the current summary of a news feed:\n"
+            f"{previous['summary']}\n\n"
+            "Rewrite it as a short paragraph with these changes."
+        )
+        if new_headlines:
+            prompt += (
+                " Include these new headlines, giving them priority over older stories:\n"
+                f"{chr(10).join(new_headlines)}"
+            )
+        if dropped_headlines:
+            prompt += (
+                "\n\nThese headlines are no longer in the feed; remove their stories "
+                f"from the summary:\n{chr(10).join(sorted(dropped_headlines))}"
+            )
     else:
-        return [f"Error fetching news: {response.status_code}"]
-
-# ---------------- Summarize with Gemini (Unchanged) ----------------
-def summarize_with_gemini(news_list):
-    # NOTE: The model name "gemini-2.5-flash" might not exist.
-    # The user should update this to a valid model like "gemini-1.5-flash".
-    # For this example, I am keeping the user's original model name.
-    model = genai.GenerativeModel("models/gemini-2.5-flash") 
-    prompt = f"Summarize these latest news headlines in a short paragraph:\n{chr(10).join(news_list)}"
-    response = model.generate_content(prompt)
-    return response.text
+        prompt = f"Summarize these latest news headlines in a short paragraph:\n{chr(10).join(news_list)}"
+    # The router picks an available model from the cached catalog and falls back if needed
+    _, summary = get_router().generate(prompt, latency_target=SUMMARY_LATENCY_TARGET)
+
+    if feed_key is not None:
+        with feed_state_lock:
+            # Only the current headlines: anything that left the feed was dropped above
+            feed_state[feed_key] = {"seen": set(news_list), "summary": summary}
+    return summary
+
+# ---------------- Feed Cache ----------------
+class TTLCache:
+    """Thread-safe dict whose entries expire after `ttl` seconds."""
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+
+
+# (country_code, category) -> {"headlines": [...], "summary": "..."}
+feed_cache = TTLCache(CACHE_TTL_SECONDS)
+executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+# Workers never touch Tk widgets; they post (kind, key, payload) here instead
+ui_queue = queue.Queue()
+pending_feeds = set()  # Keys with a job already queued or running
+pending_lock = threading.Lock()
+
+# ---------------- Background Workers ----------------
+def load_feed(key):
+    """Fetch and summarize one feed in a worker thread, reporting back via ui_queue."""
+    try:
+        country_code, category = key
+        # Fetch errors are raised (and reported below), never summarized or cached
+        articles = fetch_articles(country_code, category)
+        if not articles:
+            feed_cache.set(key, {"headlines": [NO_NEWS], "summary": ""})
+            ui_queue.put(("summary", key, ""))
+            return
+        headlines = [article["title"] for article in articles]
+        ui_queue.put(("headlines", key, headlines))
+        summary = summarize_with_gemini(headlines, feed_key=key)
+        # Cache before announcing, so the UI can redraw both panes from the cache
+        feed_cache.set(key, {"headlines": headlines, "summary": summary})
+        ui_queue.put(("summary", key, summary))
+    except Exception as e:
+        ui_queue.put(("error", key, e))
+    finally:
+        with pending_lock:
+            pending_feeds.discard(key)
+
+def submit_feed(key, force=False):
+    """Queue a background load for `key` unless it is cached (and not `force`) or already in flight."""
+    if not force and feed_cache.get(key) is not None:
+        return
+    with pending_lock:
+        if key in pending_feeds:
+            return
+        pending_feeds.add(key)
+    executor.submit(load_feed, key)
+
+def prefetch_country(country_code):
+    """Speculatively warm the cache for every category of the selected country."""
+    for category in CATEGORIES:
+        submit_feed((country_code, category))
 
 # ---------------- UI Logic ----------------
-def fetch_and_summarize():
+def selected_key():
     # Get the user-friendly name and map it to the API code
-    country_name = country_var.get()
-    country_code = COUNTRIES.get(country_name, "us") # Get code, default to 'us'
-    category = category_var.get()
-
-    news_display.config(state="normal")
-    summary_display.config(state="normal")
-    
-    news_display.delete("1.0", tk.END)
-    summary_display.delete("1.0", tk.END)
-    news_display.insert(tk.END, "📰 Fetching latest news...\n")
-    root.update_idletasks() # Force UI update
-
-    headlines = fetch_news(country_code, category)
-    news_display.delete("1.0", tk.END)
-    news_display.insert(tk.END, "🌎 Latest Headlines:\n\n")
-    for i, h in enumerate(headlines, 1):
-        news_display.insert(tk.END, f"{i}. {h}\n\n")
-
-    summary_display.insert(tk.END, "🤖 Summarizing with Gemini...\n")
-    root.update_idletasks() # Force UI update
+    country_code = COUNTRIES.get(country_var.get(), "us") # Get code, default to 'us'
+    return (country_code, category_var.get())
+
+def set_text(widget, text):
+    widget.config(state="normal")
+    widget.delete("1.0", tk.END)
+    widget.insert(tk.END, text)
+    widget.config(state="disabled")
+
+def show_headlines(headlines):
+    lines = "".join(f"{i}. {h}\n\n" for i, h in enumerate(headlines, 1))
+    set_text(news_display, "🌎 Latest Headlines:\n\n" + lines)
+
+def show_cached(key):
+    """Render a cached feed immediately. Returns False if nothing fresh is cached."""
+    cached = feed_cache.get(key)
+    if cached is None:
+        return False
+    show_headlines(cached["headlines"])
+    set_text(summary_display, cached["summary"])
+    return True
 
+def fetch_and_summarize():
+    # The button always refreshes the selected feed; a cached copy stays on
+    # screen until the new headlines arrive. Combobox switches use the cache.
+    key = selected_key()
+    if not show_cached(key):
+        set_text(news_display, "📰 Fetching latest news...\n")
+        set_text(summary_display, "")
+    submit_feed(key, force=True)
+    prefetch_country(key[0])
+
+def on_selection_changed(event=None):
+    # Switching to an already-prefetched feed shows it without another click
+    key = selected_key()
+    if show_cached(key):
+        return
+    with pending_lock:
+        loading = key in pending_feeds
+    if loading:
+        set_text(news_display, "📰 Fetching latest news...\n")
+    else:
+        set_text(news_display, "Press 🚀 Fetch & Summarize to load this feed.\n")
+    set_text(summary_display, "")
+
+def on_country_changed(event=None):
+    prefetch_country(selected_key()[0])
+    on_selection_changed(event)
+
+def process_ui_queue():
+    """Apply finished worker results on the Tk thread, then reschedule."""
     try:
-        summary = summarize_with_gemini(headlines)
-        summary_display.delete("1.0", tk.END)
-        summary_display.insert(tk.END, summary)
-    except Exception as e:
-        summary_display.delete("1.0", tk.END)
-        messagebox.showerror("Gemini Error", f"Could not summarize: {e}")
-        
-    news_display.config(state="disabled")
-    summary_display.config(state="disabled")
+        while True:
+            kind, key, payload = ui_queue.get_nowait()
+            if key != selected_key():
+                continue  # Prefetch result for a feed that isn't on screen; it's in the cache
+            if kind == "headlines":
+                show_headlines(payload)
+                set_text(summary_display, "🤖 Summarizing with Gemini...\n")
+            elif kind == "summary":
+                # Redraw both panes: the headlines message may have arrived while
+                # another feed was on screen
+                if not show_cached(key):
+                    set_text(summary_display, payload)
+            elif kind == "error":
+                if not show_cached(key):
+                    set_text(news_display, "⚠️ Could not load this feed.\n")
+                    set_text(summary_display, "")
+                messagebox.showerror("News Bot Error", f"Could not fetch or summarize: {payload}")
+    except queue.Empty:
+        pass
+    root.after(POLL_INTERVAL_MS, process_ui_queue)
+
+def on_close():
+    executor.shutdown(wait=False, cancel_futures=True)
+    root.destroy()
 
 
 # ---------------- Tkinter UI ----------------
-root = tk.Tk()
-root.title("🌐 AI News Bot ")
-root.geometry("900x700")
-root.minsize(700, 600) # Set a minimum size
-
-# --- Modern Styling ---
-BG_COLOR = "#252526"
-FG_COLOR = "#FFFFFF"
-WIDGET_BG = "#3E3E42"
-ACCENT_COLOR = "#007ACC" # Professional Blue
-FONT_BOLD = ("Poppins", 13, "bold")
-FONT_REGULAR = ("Poppins", 11)
-
-root.configure(bg=BG_COLOR)
-
-# --- Style Configuration ---
-style = ttk.Style()
-style.theme_use("clam")
-
-# Global style for all widgets
-style.configure(".",
-                background=BG_COLOR,
-                foreground=FG_COLOR,
-                font=FONT_REGULAR,
-                fieldbackground=WIDGET_BG,
-                padding=5)
-
-# Button Style
-style.configure("TButton",
-                font=FONT_BOLD,
-                background=ACCENT_COLOR,
-                foreground=FG_COLOR,
-                borderwidth=0,
-                padding=(20, 10)) # (horizontal, vertical)
-style.map("TButton",
-          background=[("active", "#005FA3")]) # Darker on click/hover
-
-# Combobox Style
-style.configure("TCombobox",
-                arrowsize=15,
-                fieldbackground=WIDGET_BG,
-                background=WIDGET_BG,
-                foreground=FG_COLOR)
-# Style for the dropdown list itself
-root.option_add("*TCombobox*Listbox*Background", WIDGET_BG)
-root.option_add("*TCombobox*Listbox*Foreground", FG_COLOR)
-root.option_add("*TCombobox*Listbox*selectBackground", ACCENT_COLOR)
-root.option_add("*TCombobox*Listbox*selectForeground", FG_COLOR)
-
-# Label Styles
-style.configure("TLabel", font=FONT_REGULAR)
-style.configure("Header.TLabel", font=FONT_BOLD) # A new style for headers
-style.configure("TFrame", background=BG_COLOR)
-
-
-# --- Main Layout Frames ---
-# Using pack for the main sections, and grid inside the controls_frame
-controls_frame = ttk.Frame(root, padding=(20, 20, 20, 10))
-controls_frame.pack(fill="x", side="top", anchor="n")
-
-output_frame = ttk.Frame(root, padding=(20, 10, 20, 20))
-output_frame.pack(fill="both", expand=True, side="bottom")
-
-
-# --- Controls Frame (Grid Layout) ---
-controls_frame.grid_columnconfigure(1, weight=1) # Make combobox column expandable
-
-# Row 0: Country
-ttk.Label(controls_frame, text="🌎 Country:").grid(row=0, column=0, sticky="w", padx=(0, 10))
-country_var = tk.StringVar(value="United States") # Default to display name
-country_menu = ttk.Combobox(controls_frame, textvariable=country_var, values=list(COUNTRIES.keys()), state="readonly")
-country_menu.grid(row=0, column=1, sticky="ew")
-
-# Row 1: Category
-ttk.Label(controls_frame, text="🗂️ Category:").grid(row=1, column=0, sticky="w", padx=(0, 10), pady=10)
-category_var = tk.StringVar(value="world")
-category_menu = ttk.Combobox(controls_frame, textvariable=category_var, values=CATEGORIES, state="readonly")
-category_menu.grid(row=1, column=1, sticky="ew", pady=10)
-
-# Row 0 & 1, Col 2: Button
-fetch_button = ttk.Button(controls_frame, text="🚀 Fetch & Summarize", command=fetch_and_summarize)
-fetch_button.grid(row=0, column=2, rowspan=2, sticky="ns", padx=(20, 0))
-
-
-# --- Output Frame (Grid Layout) ---
-output_frame.grid_rowconfigure(1, weight=1) # News text row
-output_frame.grid_rowconfigure(3, weight=1) # Summary text row
-output_frame.grid_columnconfigure(0, weight=1) # Single column
-
-# News Header
-ttk.Label(output_frame, text="📰 Latest News", style="Header.TLabel").grid(row=0, column=0, sticky="w", pady=(10, 5))
-
-# News Display
-news_display = scrolledtext.ScrolledText(output_frame, wrap=tk.WORD, height=10,
-                                         bg=WIDGET_BG, fg=FG_COLOR, font=FONT_REGULAR,
-                                         relief="flat", borderwidth=0, 
-                                         highlightthickness=1, # Subtle border
-                                         highlightcolor=ACCENT_COLOR,
-                                         padx=10, pady=10, state="disabled")
-news_display.grid(row=1, column=0, sticky="nsew")
-
-# Summary Header
-ttk.Label(output_frame, text="🧠 AI Summary", style="Header.TLabel").grid(row=2, column=0, sticky="w", pady=(15, 5))
-
-# Summary Display
-summary_display = scrolledtext.ScrolledText(output_frame, wrap=tk.WORD, height=10,
-                                            bg=WIDGET_BG, fg=FG_COLOR, font=FONT_REGULAR,
-                                            relief="flat", borderwidth=0, 
-                                            highlightthickness=1, # Subtle border
-                                            highlightcolor=ACCENT_COLOR,
-                                            padx=10, pady=10, state="disabled")
-summary_display.grid(row=3, column=0, sticky="nsew")
-
-
-root.mainloop()
\ No newline at end of file
+def main():
+    global root, country_var, category_var, news_display, summary_display
+
+    root = tk.Tk()
+    root.title("🌐 AI News Bot ")
+    root.geometry("900x700")
+    root.minsize(700, 600) # Set a minimum size
+
+    # --- Modern Styling ---
+    BG_COLOR = "#252526"
+    FG_COLOR = "#FFFFFF"
+    WIDGET_BG = "#3E3E42"
+    ACCENT_COLOR = "#007ACC" # Professional Blue
+    FONT_BOLD = ("Poppins", 13, "bold")
+    FONT_REGULAR = ("Poppins", 11)
+
+    root.configure(bg=BG_COLOR)
+
+    # --- Style Configuration ---
+    style = ttk.Style()
+    style.theme_use("clam")
+
+    # Global style for all widgets
+    style.configure(".",
+                    background=BG_COLOR,
+                    foreground=FG_COLOR,
+                    font=FONT_REGULAR,
+                    fieldbackground=WIDGET_BG,
+                    padding=5)
+
+    # Button Style
+    style.configure("TButton",
+                    font=FONT_BOLD,
+                    background=ACCENT_COLOR,
+                    foreground=FG_COLOR,
+                    borderwidth=0,
+                    padding=(20, 10)) # (horizontal, vertical)
+    style.map("TButton",
+              background=[("active", "#005FA3")]) # Darker on click/hover
+
+    # Combobox Style
+    style.configure("TCombobox",
+                    arrowsize=15,
+                    fieldbackground=WIDGET_BG,
+                    background=WIDGET_BG,
+                    foreground=FG_COLOR)
+    # Style for the dropdown list itself
+    root.option_add("*TCombobox*Listbox*Background", WIDGET_BG)
+    root.option_add("*TCombobox*Listbox*Foreground", FG_COLOR)
+    root.option_add("*TCombobox*Listbox*selectBackground", ACCENT_COLOR)
+    root.option_add("*TCombobox*Listbox*selectForeground", FG_COLOR)
+
+    # Label Styles
+    style.configure("TLabel", font=FONT_REGULAR)
+    style.configure("Header.TLabel", font=FONT_BOLD) # A new style for headers
+    style.configure("TFrame", background=BG_COLOR)
+
+
+    # --- Main Layout Frames ---
+    # Using pack for the main sections, and grid inside the controls_frame
+    controls_frame = ttk.Frame(root, padding=(20, 20, 20, 10))
+    controls_frame.pack(fill="x", side="top", anchor="n")
+
+    output_frame = ttk.Frame(root, padding=(20, 10, 20, 20))
+    output_frame.pack(fill="both", expand=True, side="bottom")
+
+
+    # --- Controls Frame (Grid Layout) ---
+    controls_frame.grid_columnconfigure(1, weight=1) # Make combobox column expandable
+
+    # Row 0: Country
+    ttk.Label(controls_frame, text="🌎 Country:").grid(row=0, column=0, sticky="w", padx=(0, 10))
+    country_var = tk.StringVar(value="United States") # Default to display name
+    country_menu = ttk.Combobox(controls_frame, textvariable=country_var, values=list(COUNTRIES.keys()), state="readonly")
+    country_menu.grid(row=0, column=1, sticky="ew")
+
+    # Row 1: Category
+    ttk.Label(controls_frame, text="🗂️ Category:").grid(row=1, column=0, sticky="w", padx=(0, 10), pady=10)
+    category_var = tk.StringVar(value="world")
+    category_menu = ttk.Combobox(controls_frame, textvariable=category_var, values=CATEGORIES, state="readonly")
+    category_menu.grid(row=1, column=1, sticky="ew", pady=10)
+
+    country_menu.bind("<<ComboboxSelected>>", on_country_changed)
+    category_menu.bind("<<ComboboxSelected>>", on_selection_changed)
+
+    # Row 0 & 1, Col 2: Button
+    fetch_button = ttk.Button(controls_frame, text="🚀 Fetch & Summarize", command=fetch_and_summarize)
+    fetch_button.grid(row=0, column=2, rowspan=2, sticky="ns", padx=(20, 0))
+
+
+    # --- Output Frame (Grid Layout) ---
+    output_frame.grid_rowconfigure(1, weight=1) # News text row
+    output_frame.grid_rowconfigure(3, weight=1) # Summary text row
+    output_frame.grid_columnconfigure(0, weight=1) # Single column
+
+    # News Header
+    ttk.Label(output_frame, text="📰 Latest News", style="Header.TLabel").grid(row=0, column=0, sticky="w", pady=(10, 5))
+
+    # News Display
+    news_display = scrolledtext.ScrolledText(output_frame, wrap=tk.WORD, height=10,
+                                             bg=WIDGET_BG, fg=FG_COLOR, font=FONT_REGULAR,
+                                             relief="flat", borderwidth=0, 
+                                             highlightthickness=1, # Subtle border
+                                             highlightcolor=ACCENT_COLOR,
+                                             padx=10, pady=10, state="disabled")
+    news_display.grid(row=1, column=0, sticky="nsew")
+
+    # Summary Header
+    ttk.Label(output_frame, text="🧠 AI Summary", style="Header.TLabel").grid(row=2, column=0, sticky="w", pady=(15, 5))
+
+    # Summary Display
+    summary_display = scrolledtext.ScrolledText(output_frame, wrap=tk.WORD, height=10,
+                                                bg=WIDGET_BG, fg=FG_COLOR, font=FONT_REGULAR,
+                                                relief="flat", borderwidth=0, 
+                                                highlightthickness=1, # Subtle border
+                                                highlightcolor=ACCENT_COLOR,
+                                                padx=10, pady=10, state="disabled")
+    summary_display.grid(row=3, column=0, sticky="nsew")
+
+
+    root.protocol("WM_DELETE_WINDOW", on_close)
+    root.after(POLL_INTERVAL_MS, process_ui_queue)
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+# news_digest.py
+"""
+Headless News Digest Daemon
+- Polls every COUNTRIES x CATEGORIES feed from gnews.py on a schedule
+- Spaces GNews requests so a full day stays under the API's daily quota
+- Deduplicates articles across feeds by URL and normalized title hash
+- Summarizes several feeds per Gemini call and writes digests to disk
+
+Usage:
+    python news_digest.py                 # run forever
+    python news_digest.py --once          # one full pass, then exit
+    python news_digest.py --daily-limit 1000 --output-dir digests
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+import requests
+import google.generativeai as genai
+from dotenv import load_dotenv
+
+from gnews import COUNTRIES, CATEGORIES, GNEWS_MIN_INTERVAL, fetch_articles
+from model_catalog import get_router
+
+# ==============================
+# Settings
+# ==============================
+GNEWS_DAILY_LIMIT = 100        # GNews free plan: 100 requests/day
+FEEDS_PER_CALL = 8             # Feeds combined into one Gemini prompt
+MAX_SEEN_ARTICLES = 5000       # Dedup memory; oldest keys are forgotten first
+
+# ==============================
+# Deduplication
+# ==============================
+def title_hash(title: str) -> str:
+    """Hash a title after lowercasing and stripping punctuation/extra spaces."""
+    normalized = " ".join(re.sub(r"[^a-z0-9\s]", " ", title.lower()).split())
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+class ArticleDeduper:
+    """Remembers recently seen articles by URL and by normalized title."""
+
+    def __init__(self, max_size=MAX_SEEN_ARTICLES):
+        self.max_size = max_size
+        self._seen = OrderedDict()
+
+    def _remember(self, key):
+        self._seen[key] = True
+        self._seen.move_to_end(key)
+        while len(self._seen) > self.max_size:
+            self._seen.popitem(last=False)
+
+    def is_new(self, article) -> bool:
+        """True the first time an article (or a retitled/re-linked copy) is seen."""
+        keys = [("title", title_hash(article.get("title", "")))]
+        if article.get("url"):
+            keys.append(("url", article["url"]))
+        if any(key in self._seen for key in keys):
+            for key in keys:
+                self._remember(key)
+            return False
+        for key in keys:
+            self._remember(key)
+        return True
+
+# ==============================
+# Scheduling
+# ==============================
+def request_interval(daily_limit: int) -> float:
+    """Seconds to wait between GNews requests to stay within the daily quota."""
+    return max(GNEWS_MIN_INTERVAL, 24 * 60 * 60 / daily_limit)
+
+def all_feeds():
+    return [(name, code, category) for name, code in COUNTRIES.items() for category in CATEGORIES]
+
+def batched(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+# ==============================
+# Summarization
+# ==============================
+def feed_label(feed):
+    country_name, _, category = feed
+    return f"{country_name} / {category}"
+
+def summarize_batch(batch):
+    """Summarize several feeds with a single Gemini call.
+
+    `batch` is a list of (feed, articles) pairs; the model is asked to answer
+    with one section per feed so the digest stays readable.
+    """
+    sections = []
+    for feed, articles in batch:
+        headlines = "\n".join(f"- {a['title']}" for a in articles)
+        sections.append(f"### {feed_label(feed)}\n{headlines}")
+    prompt = (
+        "Summarize the latest news headlines for each feed below. For every feed, keep its "
+        "'### <feed>' heading and write a short paragraph under it.\n\n"
+        + "\n\n".join(sections)
+    )
+    _, summary = get_router().generate(prompt)
+    return summary
+
+def write_digest(output_dir, batch, summary):
+    os.makedirs(output_dir, exist_ok=True)
+    filename = os.path.join(output_dir, f"digest_{datetime.now().strftime('%Y%m%d_%H%M%S')}.md")
+    lines = [f"# News Digest — {datetime.now().strftime('%Y-%m-%d %H:%M')}", "", "## Summary", "", summary, "", "## Articles", ""]
+    for feed, articles in batch:
+        lines.append(f"### {feed_label(feed)}")
+        lines.extend(f"- [{a['title']}]({a.get('url', '')})" for a in articles)
+        lines.append("")
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+    return filename
+
+# ==============================
+# Daemon loop
+# ==============================
+def run_pass(deduper, interval, output_dir):
+    """Fetch every feed once, summarizing and writing a digest per batch."""
+    for feeds in batched(all_feeds(), FEEDS_PER_CALL):
+        batch = []
+        for feed in feeds:
+            _, country_code, category = feed
+            try:
+                articles = fetch_articles(country_code, category)
+            except requests.RequestException as e:
+                print(f"⚠️ Could not fetch {feed_label(feed)}: {e}")
+                articles = []
+            fresh = [a for a in articles if a.get("title") and deduper.is_new(a)]
+            if fresh:
+                batch.append((feed, fresh))
+            time.sleep(interval)
+
+        if not batch:
+            print("ℹ️ No new articles in this batch, skipping Gemini call.")
+            continue
+        try:
+            summary = summarize_batch(batch)
+        except Exception as e:
+            print(f"⚠️ Gemini error: {e}")
+            continue
+        print(f"✅ Wrote {write_digest(output_dir, batch, summary)} ({len(batch)} feeds, 1 model call)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless multi-feed news digest daemon")
+    parser.add_argument("--daily-limit", type=int, default=GNEWS_DAILY_LIMIT,
+                        help="GNews requests allowed per day (default: %(default)s)")
+    parser.add_argument("--output-dir", default="digests", help="Where digests are written")
+    parser.add_argument("--once", action="store_true", help="Run a single pass and exit")
+    args = parser.parse_args()
+
+    load_dotenv()
+    genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+
+    deduper = ArticleDeduper()
+    interval = request_interval(args.daily_limit)
+    print(f"📰 Polling {len(all_feeds())} feeds, one request every {interval:.0f}s")
+
+    while True:
+        run_pass(deduper, interval, args.output_dir)
+        if args.once:
+            break
+
+if __name__ == "__main__":
+    main()
@@ -4,11 +4,19 @@ AI Research Assistant
 - Uses SerpAPI for web search (multiple engines)
 - Uses Google Gemini (ChatGoogleGenerativeAI) for summarization
 - Fetches top URLs, summarizes them, and produces a final report
+- Skips near-duplicate (syndicated/mirrored) pages via MinHash and backfills
+  with the next-ranked URL
+- Runs search, fetch, summarize and reduce under one time budget and always
+  returns a report from whatever finished, listing dropped sources
 - Saves results to outputs/ and provides download buttons
 """
 
+import hashlib
 import os
+import random
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout, wait
 from datetime import datetime
 from dotenv import load_dotenv
 
@@ -17,7 +25,6 @@ import requests
 from bs4 import BeautifulSoup
 
 # LangChain
-from langchain.chains import LLMChain
 from langchain.prompts import PromptTemplate
 from langchain.memory import ConversationBufferMemory
 
@@ -42,36 +49,108 @@ if not GOOGLE_API_KEY or not SERPAPI_API_KEY:
 # ==============================
 # Utilities
 # ==============================
-def fetch_webpage_text(url: str, max_chars: int = 8000) -> str:
-    """Fetch readable text from a URL using requests + BeautifulSoup"""
-    try:
-        headers = {"User-Agent": "Mozilla/5.0"}
-        res = requests.get(url, headers=headers, timeout=10)
-        res.raise_for_status()
-        soup = BeautifulSoup(res.text, "html.parser")
-        paragraphs = [p.get_text() for p in soup.find_all("p")]
-        text = " ".join(paragraphs)
-        return text[:max_chars]
-    except Exception as e:
-        return f"[Error fetching {url}]: {e}"
+def fetch_webpage_text(url: str, max_chars: int = 8000, timeout: float = 10) -> tuple:
+    """Fetch readable text from a URL using requests + BeautifulSoup (raises on failure)
+
+    Returns (full_text, truncated_text): the full text is used for duplicate
+    detection, the truncated text is what gets sent to the LLM.
+    """
+    headers = {"User-Agent": "Mozilla/5.0"}
+    res = requests.get(url, headers=headers, timeout=timeout)
+    res.raise_for_status()
+    soup = BeautifulSoup(res.text, "html.parser")
+    paragraphs = [p.get_text() for p in soup.find_all("p")]
+    text = " ".join(paragraphs)
+    return text, text[:max_chars]
 
 def safe_filename(s: str) -> str:
     return re.sub(r'[^a-zA-Z0-9_-]', '_', s)[:50]
 
+# ==============================
+# Near-duplicate detection
+# ==============================
+MAX_SOURCES = 5            # Distinct sources summarized per query
+MAX_CANDIDATE_URLS = 10    # Ranked URLs kept so duplicates can be backfilled
+MINHASH_PERMUTATIONS = 128
+NEAR_DUPLICATE_SIMILARITY = 0.8  # Estimated Jaccard similarity at which two pages count as copies
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_minhash_rng = random.Random(42)  # Fixed seed: signatures must be comparable across sources
+_MINHASH_PARAMS = [
+    (_minhash_rng.randrange(1, _MERSENNE_PRIME), _minhash_rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(MINHASH_PERMUTATIONS)
+]
+
+def minhash(text: str) -> list:
+    """MinHash signature over word 5-gram shingles of the full page text"""
+    words = re.findall(r"\w+", text.lower())
+    shingles = {" ".join(words[i:i + 5]) for i in range(max(len(words) - 4, 1))}
+    hashes = [int.from_bytes(hashlib.blake2b(sh.encode("utf-8"), digest_size=8).digest(), "big") for sh in shingles]
+    return [min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _MINHASH_PARAMS]
+
+def estimated_similarity(a: list, b: list) -> float:
+    """Fraction of matching MinHash slots, an estimate of shingle Jaccard similarity"""
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+def find_near_duplicate(fingerprint: list, accepted: list) -> int:
+    """Index of the accepted source this fingerprint duplicates, or -1"""
+    for i, source in enumerate(accepted):
+        if estimated_similarity(fingerprint, source["fingerprint"]) >= NEAR_DUPLICATE_SIMILARITY:
+            return i
+    return -1
+
+# ==============================
+# Deadline scheduling
+# ==============================
+DEFAULT_BUDGET_SECONDS = 30
+# Share of the budget each stage gets; time a stage doesn't use rolls over to later ones
+STAGE_SHARES = {"search": 0.2, "fetch": 0.2, "summarize": 0.35, "reduce": 0.25}
+
+class DeadlineScheduler:
+    """Spreads one overall time budget across the pipeline stages"""
+
+    def __init__(self, total_seconds: float, shares: dict = STAGE_SHARES, clock=time.monotonic):
+        self.clock = clock
+        self.deadline = clock() + total_seconds
+        self._pending_shares = dict(shares)
+
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - self.clock())
+
+    def start_stage(self, name: str) -> float:
+        """Return the absolute deadline for `name`, sized from the time still left"""
+        share = self._pending_shares.pop(name)
+        total_share = share + sum(self._pending_shares.values())
+        return self.clock() + self.remaining() * share / total_share
+
+    def time_left(self, stage_deadline: float) -> float:
+        return max(0.0, stage_deadline - self.clock())
+
 # ==============================
 # Initialize LLM (Gemini)
 # ==============================
-llm = ChatGoogleGenerativeAI(
-    model="models/gemini-2.5-flash", # <-- Using the model name you confirmed works
-    google_api_key=GOOGLE_API_KEY,
-    temperature=0.3,
-    safety_settings={  # <-- Re-adding safety settings to prevent hanging
-        HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
-        HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
-        HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
-        HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
-    },
-)
+LLM_MAX_RETRIES = 1  # Retries would outlive the time budget
+
+def build_llm(timeout: float) -> ChatGoogleGenerativeAI:
+    """Gemini client whose requests give up after `timeout` seconds.
+
+    Calls abandoned at a stage deadline can't be cancelled from here, so the
+    request timeout (set per run to the run's budget) is what stops them
+    from running on in the Streamlit process.
+    """
+    return ChatGoogleGenerativeAI(
+        model="models/gemini-2.5-flash", # <-- Using the model name you confirmed works
+        google_api_key=GOOGLE_API_KEY,
+        temperature=0.3,
+        timeout=timeout,
+        max_retries=LLM_MAX_RETRIES,
+        safety_settings={  # <-- Re-adding safety settings to prevent hanging
+            HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
+            HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
+            HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
+            HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
+        },
+    )
 
 # ==============================
 # Conversation memory
@@ -83,7 +162,7 @@ memory = ConversationBufferMemory(
 )
 
 # ==============================
-# Research Chain
+# Research Prompt (final reduce step)
 # ==============================
 prompt = PromptTemplate(
     input_variables=["query", "sources"],
@@ -94,8 +173,6 @@ prompt = PromptTemplate(
     ),
 )
 
-research_chain = LLMChain(llm=llm, prompt=prompt, memory=memory)
-
 # ==============================
 # Streamlit UI
 # ==============================
@@ -104,110 +181,203 @@ st.title("🧠 AI Research Assistant")
 st.write("Search the web, summarize findings, and save results — powered by Gemini & LangChain")
 
 query = st.text_input("🔍 Enter your research topic or question:")
+budget_seconds = st.slider("⏱️ Time budget (seconds)", min_value=10, max_value=180, value=DEFAULT_BUDGET_SECONDS, step=5)
 
 # Multiple search engines fallback
 search_engines = ["google", "bing", "duckduckgo"]
 
+def search_urls(engine: str) -> list:
+    # 1. Define the search parameters, including the engine
+    search_params = {
+        "engine": engine,
+        "gl": "us", # Added for location consistency (US)
+        "hl": "en", # Added for language consistency (English)
+    }
+
+    # 2. Pass this dictionary to the 'params' argument
+    searcher = SerpAPIWrapper(
+        serpapi_api_key=SERPAPI_API_KEY,
+        params=search_params
+    )
+
+    # 3. Now call .results() with only the query
+    results_dict = searcher.results(query)
+    
+    # Get the list of organic results, default to empty list if key not found
+    organic_results = results_dict.get("organic_results", [])
+    engine_urls = [item["link"] for item in organic_results if "link" in item]
+
+    # Use dict.fromkeys to get unique URLs while preserving order. Keep a few
+    # extra ranked URLs so near-duplicates can be replaced later.
+    return list(dict.fromkeys(engine_urls))[:MAX_CANDIDATE_URLS]
+
 if st.button("Run Research") and query:
-    with st.spinner("Searching and summarizing... (This may take a minute or two)"):
+    scheduler = DeadlineScheduler(budget_seconds)
+    llm = build_llm(timeout=budget_seconds)
+    # Each stage gets its own executor, shut down without waiting when the stage
+    # ends: workers that missed their deadline are abandoned and can't hold up
+    # the next stage's queue.
+    dropped = []  # (url or search engine, reason) for everything left out of the report
+
+    with st.spinner(f"Searching and summarizing within {budget_seconds}s..."):
+        # ---------- Stage 1: search ----------
         urls = []
+        stage_deadline = scheduler.start_stage("search")
+        search_executor = ThreadPoolExecutor(max_workers=len(search_engines))
         for engine in search_engines:
+            time_left = scheduler.time_left(stage_deadline)
+            if time_left <= 0:
+                st.warning(f"Search time budget used up, skipping {engine.capitalize()}.")
+                dropped.append((f"{engine} search", "not tried: search time budget used up"))
+                continue
             st.info(f"Searching via {engine.capitalize()}...")
             try:
-                # 1. Define the search parameters, including the engine
-                search_params = {
-                    "engine": engine,
-                    "gl": "us", # Added for location consistency (US)
-                    "hl": "en", # Added for language consistency (English)
-                }
-
-                # 2. Pass this dictionary to the 'params' argument
-                searcher = SerpAPIWrapper(
-                    serpapi_api_key=SERPAPI_API_KEY,
-                    params=search_params
-                )
-
-                # 3. Now call .results() with only the query
-                results_dict = searcher.results(query)
-                
-                # Get the list of organic results, default to empty list if key not found
-                organic_results = results_dict.get("organic_results", [])
-                
-                engine_urls = []
-                if organic_results:
-                    for item in organic_results:
-                        if "link" in item:
-                            engine_urls.append(item["link"])
-                
-                # Use dict.fromkeys to get unique URLs while preserving order, then limit to 5
-                if engine_urls:
-                    engine_urls = list(dict.fromkeys(engine_urls))[:5]
-                
-
+                engine_urls = search_executor.submit(search_urls, engine).result(timeout=time_left)
                 if engine_urls:
                     st.success(f"✅ Found {len(engine_urls)} URLs using {engine.capitalize()}")
                     urls = engine_urls
                     break # Found URLs, stop trying other engines
                 else:
                     st.warning(f"No URLs found on {engine.capitalize()}. Trying next engine...")
-                    
+                    dropped.append((f"{engine} search", "no results"))
+            except FutureTimeout:
+                st.warning(f"Search on {engine.capitalize()} was too slow, moving on")
+                dropped.append((f"{engine} search", "search exceeded time budget"))
             except Exception as e:
                 st.warning(f"Search failed on {engine.capitalize()}: {e}")
+                dropped.append((f"{engine} search", f"search failed: {e}"))
+        search_executor.shutdown(wait=False, cancel_futures=True)
 
         if not urls:
             st.error("No URLs found using any search engine. Try a different query.")
+            final_summary = "No URLs were found by any search engine within the time budget, so there was nothing to summarize."
+            combined_sources = ""
         else:
-            summaries = []
-            st.info("Summarizing fetched content (this is the slow part)...")
-            
-            for i, url in enumerate(urls, start=1):
-                st.info(f"📄 Fetching source {i}: {url}")
-                text = fetch_webpage_text(url)
+            # ---------- Stage 2: fetch (all candidates in parallel) ----------
+            stage_deadline = scheduler.start_stage("fetch")
+            fetch_timeout = min(10, scheduler.time_left(stage_deadline))
+            st.info(f"📄 Fetching {len(urls)} sources (up to {fetch_timeout:.0f}s)...")
+            fetch_executor = ThreadPoolExecutor(max_workers=len(urls))
+            fetch_futures = {url: fetch_executor.submit(fetch_webpage_text, url, timeout=fetch_timeout) for url in urls}
+            wait(fetch_futures.values(), timeout=scheduler.time_left(stage_deadline))
+            fetch_executor.shutdown(wait=False, cancel_futures=True)
+
+            # Pick distinct sources in rank order; duplicates are replaced by the next URL
+            sources = []  # Accepted distinct sources: url, fingerprint, text, summary, mirrors
+            duplicates_skipped = 0
+            for url, future in fetch_futures.items():
+                if len(sources) >= MAX_SOURCES:
+                    future.cancel()
+                    continue
+                if not future.done():
+                    future.cancel()
+                    dropped.append((url, "fetch exceeded time budget"))
+                    continue
+                if future.exception() is not None:
+                    dropped.append((url, f"fetch failed: {future.exception()}"))
+                    continue
+                full_text, text = future.result()
                 
                 if len(text) < 100: # Increased minimum content length
-                    st.warning(f"Skipped {url}, too little content")
+                    dropped.append((url, "too little content"))
                     continue
-                
-                st.write(f"Summarizing source {i} (approx {len(text)} chars)...")
-                try:
-                    # Summarize each page individually
-                    summary_prompt = f"Based on the query '{query}', please summarize the key information from the following text:\n\n{text}"
-                    summary = llm.invoke(summary_prompt)
-                    
-                    st.write(f"✅ Summary complete for source {i}.")
-                    
-                    summaries.append(f"Source {i}: {url}\n{summary.content}\n")
-                except Exception as e:
-                    st.error(f"Error summarizing {url}: {e}")
 
+                # Drop syndicated/mirrored copies before spending an LLM call on them
+                fingerprint = minhash(full_text)
+                dup_index = find_near_duplicate(fingerprint, sources)
+                if dup_index >= 0:
+                    original = sources[dup_index]
+                    original["mirrors"].append(url)
+                    duplicates_skipped += 1
+                    dropped.append((url, f"near-duplicate of {original['url']}"))
+                    continue
+                sources.append({"url": url, "fingerprint": fingerprint, "text": text, "summary": None, "mirrors": []})
+
+            if duplicates_skipped:
+                st.info(f"♻️ Skipped {duplicates_skipped} near-duplicate source(s), saving {duplicates_skipped} LLM call(s)")
+
+            # ---------- Stage 3: summarize (in parallel) ----------
+            stage_deadline = scheduler.start_stage("summarize")
+            st.info(f"Summarizing {len(sources)} sources (this is the slow part)...")
+            summary_executor = ThreadPoolExecutor(max_workers=max(len(sources), 1))
+            summary_futures = {}
+            for source in sources:
+                # Summarize each page individually
+                summary_prompt = f"Based on the query '{query}', please summarize the key information from the following text:\n\n{source['text']}"
+                summary_futures[source["url"]] = summary_executor.submit(llm.invoke, summary_prompt)
+            wait(summary_futures.values(), timeout=scheduler.time_left(stage_deadline))
+            summary_executor.shutdown(wait=False, cancel_futures=True)
+
+            for source in sources:
+                future = summary_futures[source["url"]]
+                if not future.done():
+                    future.cancel()
+                    dropped.append((source["url"], "summary exceeded time budget"))
+                elif future.exception() is not None:
+                    dropped.append((source["url"], f"summary failed: {future.exception()}"))
+                else:
+                    source["summary"] = future.result().content
+            finished = [source for source in sources if source["summary"] is not None]
+            st.write(f"✅ {len(finished)} of {len(sources)} summaries finished in time.")
+
+            summaries = []
+            for i, source in enumerate(finished, start=1):
+                mirrors = f"Also published at: {', '.join(source['mirrors'])}\n" if source["mirrors"] else ""
+                summaries.append(f"Source {i}: {source['url']}\n{mirrors}{source['summary']}\n")
+
+            # ---------- Stage 4: reduce ----------
+            scheduler.start_stage("reduce")
             if not summaries:
-                st.error("Could not fetch or summarize any content from the found URLs.")
+                final_summary = "No source could be fetched and summarized within the time budget."
+                combined_sources = ""
             else:
                 st.info("Combining summaries into a final report...")
                 combined_sources = "\n\n".join(summaries)
                 
-                # Run the final research chain
-                final_summary = research_chain.run({"query": query, "sources": combined_sources})
+                # Run the final research prompt; fall back to the raw summaries if it runs late.
+                # The worker only calls the LLM and memory is updated here on success, so an
+                # abandoned call can't write into the conversation memory after the run ends.
+                reduce_executor = ThreadPoolExecutor(max_workers=1)
+                reduce_prompt = prompt.format(query=query, sources=combined_sources)
+                try:
+                    final_summary = reduce_executor.submit(llm.invoke, reduce_prompt).result(
+                        timeout=scheduler.remaining()
+                    ).content
+                    memory.save_context({"query": query}, {"text": final_summary})
+                except FutureTimeout:
+                    final_summary = "⚠️ Final synthesis exceeded the time budget; per-source summaries below.\n\n" + combined_sources
+                except Exception as e:
+                    final_summary = f"⚠️ Final synthesis failed ({e}); per-source summaries below.\n\n" + combined_sources
+                reduce_executor.shutdown(wait=False, cancel_futures=True)
 
-                st.success("🎉 Research complete!")
-                st.subheader("🧩 Combined Summary")
-                st.write(final_summary)
+        dropped_report = "\n".join(f"- {url}: {reason}" for url, reason in dropped) or "None"
 
-                # Save to file
-                os.makedirs("outputs", exist_ok=True)
-                filename = f"outputs/{safe_filename(query)}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
-                
-                file_content = f"Query: {query}\n\n--- Combined Summary ---\n{final_summary}\n\n--- Individual Sources ---\n{combined_sources}"
-                
-                with open(filename, "w", encoding="utf-8") as f:
-                    f.write(file_content)
+        if urls:
+            st.success("🎉 Research complete!")
+        st.subheader("🧩 Combined Summary")
+        st.write(final_summary)
+        if dropped:
+            st.subheader("🚫 Dropped Sources")
+            st.markdown(dropped_report)
 
-                st.success(f"✅ Saved summary to {filename}")
-                
-                # Re-read for download button
-                with open(filename, "r", encoding="utf-8") as file:
-                    st.download_button(
-                        "⬇️ Download Summary", 
-                        data=file.read(), # Pass the content directly
-                        file_name=os.path.basename(filename)
-                    )
\ No newline at end of file
+        # Save to file
+        os.makedirs("outputs", exist_ok=True)
+        filename = f"outputs/{safe_filename(query)}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+        
+        file_content = (
+            f"Query: {query}\n\n--- Combined Summary ---\n{final_summary}\n\n"
+            f"--- Individual Sources ---\n{combined_sources}\n\n--- Dropped Sources ---\n{dropped_report}"
+        )
+        
+        with open(filename, "w", encoding="utf-8") as f:
+            f.write(file_content)
+
+        st.success(f"✅ Saved summary to {filename}")
+        
+        # Re-read for download button
+        with open(filename, "r", encoding="utf-8") as file:
+            st.download_button(
+                "⬇️ Download Summary", 
+                data=file.read(), # Pass the content directly
+                file_name=os.path.basename(filename)
+            )